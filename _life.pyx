@@ -0,0 +1,39 @@
+# cython: boundscheck=False, wraparound=False, language_level=3
+"""
+_life.pyx
+agent <agent@local>
+2026-10-15
+
+Cython wrapper around the C update kernel in life_kernel.c.
+
+Build it in place with `python setup.py build_ext --inplace`, which needs Cython.
+
+
+"""
+
+from libc.stdint cimport uint8_t
+
+
+cdef extern from "life_kernel.h":
+    long life_step(const uint8_t *inp, uint8_t *out, int rows, int cols) nogil
+
+
+def step(const uint8_t[:, ::1] g, uint8_t[:, ::1] out):
+    """
+    Advance a uint8 board by one generation with the C kernel.
+
+    Params:
+        g (numpy.ndarray): The current C-contiguous (width + 2, height + 2) uint8
+            board, with a dead ghost border one cell wide on every side.
+        out (numpy.ndarray): A preallocated board of the same shape and ghost
+            border to write the next generation into. Must not be `g`.
+
+    Returns:
+        int: The number of alive cells in `out`.
+    """
+    if g.shape[0] != out.shape[0] or g.shape[1] != out.shape[1]:
+        raise ValueError("g and out must have the same shape")
+    cdef long alive
+    with nogil:
+        alive = life_step(&g[0, 0], &out[0, 0], g.shape[0], g.shape[1])
+    return alive
@@ -0,0 +1,266 @@
+"""
+hashlife.py
+agent <agent@local>
+2026-10-15
+
+HashLife for Conway's Game of Life.
+
+This module contains the `Node` quadtree and the functions used by
+`Grid.advance` to jump many generations at once. Every node is interned, so
+identical regions anywhere on the board, at any time, share one node, and the
+result of stepping a node is memoized and reused wherever that region shows up
+again.
+
+Nodes live on an unbounded plane. x grows to the east and y grows to the south.
+
+
+"""
+
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class Node:
+    """
+    A 2^level x 2^level square of cells.
+
+    Nodes are compared and hashed by identity, which is only correct because
+    `join` interns them: two equal regions are always the same object.
+
+    Attributes:
+        level (int): log2 of the side length; level 0 is a single cell.
+        population (int): The number of alive cells in the square.
+        nw (Node): The north-west quadrant, or None for a single cell.
+        ne (Node): The north-east quadrant, or None for a single cell.
+        sw (Node): The south-west quadrant, or None for a single cell.
+        se (Node): The south-east quadrant, or None for a single cell.
+    """
+
+    level: int
+    population: int
+    nw: "Node" = None
+    ne: "Node" = None
+    sw: "Node" = None
+    se: "Node" = None
+
+
+DEAD = Node(0, 0)
+ALIVE = Node(0, 1)
+
+# Once this many nodes are interned, `from_cells` drops every cache and starts over.
+CACHE_LIMIT = 200_000
+
+_interned = {}
+
+
+def join(nw, ne, sw, se):
+    """
+    Combine four quadrants of the same level into the interned parent node.
+
+    Params:
+        nw (Node): The north-west quadrant.
+        ne (Node): The north-east quadrant.
+        sw (Node): The south-west quadrant.
+        se (Node): The south-east quadrant.
+
+    Returns:
+        Node: The node one level up holding the four quadrants.
+    """
+    key = (nw, ne, sw, se)
+    node = _interned.get(key)
+    if node is None:
+        population = nw.population + ne.population + sw.population + se.population
+        node = Node(nw.level + 1, population, nw, ne, sw, se)
+        _interned[key] = node
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def empty(level):
+    """
+    Return the all-dead node of a level.
+    """
+    if level == 0:
+        return DEAD
+    child = empty(level - 1)
+    return join(child, child, child, child)
+
+
+def centre(node):
+    """
+    Surround a node with dead cells, giving the node one level up with it in the middle.
+    """
+    e = empty(node.level - 1)
+    return join(
+        join(e, e, e, node.nw),
+        join(e, e, node.ne, e),
+        join(e, node.sw, e, e),
+        join(node.se, e, e, e),
+    )
+
+
+def _life_4x4(node):
+    """
+    Advance a level 2 node by one generation, returning its middle 2x2 cells.
+    """
+    cells = np.zeros((4, 4), dtype=np.uint8)
+    write_cells(node, cells, 0, 0)
+    alive = []
+    for x, y in ((1, 1), (2, 1), (1, 2), (2, 2)):
+        n = int(cells[x - 1:x + 2, y - 1:y + 2].sum()) - int(cells[x, y])
+        alive.append(ALIVE if n == 3 or (cells[x, y] and n == 2) else DEAD)
+    return join(*alive)
+
+
+@functools.lru_cache(maxsize=None)
+def successor(node, j):
+    """
+    Advance the middle of a node by 2^j generations.
+
+    Params:
+        node (Node): A node of level 2 or more.
+        j (int): log2 of the generations to advance, capped at `node.level - 2`.
+
+    Returns:
+        Node: The middle half of `node`, one level down, 2^j generations later.
+    """
+    if node.level == 2:
+        return _life_4x4(node)
+
+    j = min(j, node.level - 2)
+    nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+    # The nine overlapping half-size squares covering the node, each advanced
+    # 2^j generations, or 2^(j-1) when a second round is still to come.
+    c1 = successor(nw, j)
+    c2 = successor(join(nw.ne, ne.nw, nw.se, ne.sw), j)
+    c3 = successor(ne, j)
+    c4 = successor(join(nw.sw, nw.se, sw.nw, sw.ne), j)
+    c5 = successor(join(nw.se, ne.sw, sw.ne, se.nw), j)
+    c6 = successor(join(ne.sw, ne.se, se.nw, se.ne), j)
+    c7 = successor(sw, j)
+    c8 = successor(join(sw.ne, se.nw, sw.se, se.sw), j)
+    c9 = successor(se, j)
+
+    if j < node.level - 2:
+        return join(
+            join(c1.se, c2.sw, c4.ne, c5.nw),
+            join(c2.se, c3.sw, c5.ne, c6.nw),
+            join(c4.se, c5.sw, c7.ne, c8.nw),
+            join(c5.se, c6.sw, c8.ne, c9.nw),
+        )
+    return join(
+        successor(join(c1, c2, c4, c5), j),
+        successor(join(c2, c3, c5, c6), j),
+        successor(join(c4, c5, c7, c8), j),
+        successor(join(c5, c6, c8, c9), j),
+    )
+
+
+def from_cells(cells):
+    """
+    Build a node holding a board, with the board in its north-west corner.
+
+    Params:
+        cells (numpy.ndarray): A (width, height) uint8 array of 0s and 1s.
+
+    Returns:
+        Node: A node of level 2 or more covering the whole board.
+    """
+    if len(_interned) > CACHE_LIMIT:
+        clear_caches()
+    level = max(2, int(max(cells.shape) - 1).bit_length())
+
+    def build(x, y, level):
+        size = 1 << level
+        if not cells[x:x + size, y:y + size].any():
+            return empty(level)
+        if level == 0:
+            return ALIVE
+        half = size // 2
+        return join(
+            build(x, y, level - 1),
+            build(x + half, y, level - 1),
+            build(x, y + half, level - 1),
+            build(x + half, y + half, level - 1),
+        )
+
+    return build(0, 0, level)
+
+
+def write_cells(node, cells, x, y):
+    """
+    Copy the alive cells of a node into a board, dropping any that fall outside it.
+
+    Params:
+        node (Node): The node to copy.
+        cells (numpy.ndarray): The (width, height) uint8 board to set cells in.
+        x (int): The board x-coordinate of the node's north-west corner.
+        y (int): The board y-coordinate of the node's north-west corner.
+    """
+    size = 1 << node.level
+    width, height = cells.shape
+    if node.population == 0 or x >= width or y >= height or x + size <= 0 or y + size <= 0:
+        return
+    if node.level == 0:
+        cells[x, y] = 1
+        return
+    half = size // 2
+    write_cells(node.nw, cells, x, y)
+    write_cells(node.ne, cells, x + half, y)
+    write_cells(node.sw, cells, x, y + half)
+    write_cells(node.se, cells, x + half, y + half)
+
+
+def clear_caches():
+    """
+    Forget every interned node and memoized result.
+
+    Nodes are compared by identity, so the interning table and the caches of
+    `empty` and `successor` must all be cleared together; nodes built before
+    the clear must not be passed in afterwards.
+    """
+    _interned.clear()
+    empty.cache_clear()
+    successor.cache_clear()
+
+
+def advance(node, x, y, generations):
+    """
+    Advance a node by any number of generations on the unbounded plane.
+
+    The node is padded with dead cells until there is room for the pattern to
+    grow, then stepped by the power of two for each set bit of `generations`.
+    `node` should come straight from `from_cells`, which may clear the caches.
+
+    Params:
+        node (Node): The node to advance.
+        x (int): The board x-coordinate of the node's north-west corner.
+        y (int): The board y-coordinate of the node's north-west corner.
+        generations (int): How many generations to advance.
+
+    Returns:
+        tuple: The advanced node and the board x and y coordinates of its
+        north-west corner.
+    """
+    bits = []
+    while generations > 0:
+        bits.append(generations & 1)
+        generations >>= 1
+        shift = 1 << (node.level - 1)
+        node = centre(node)
+        x, y = x - shift, y - shift
+
+    # One more ring of dead cells keeps the last successor clear of the edge.
+    shift = 1 << (node.level - 1)
+    node = centre(node)
+    x, y = x - shift, y - shift
+
+    for j in reversed(range(len(bits))):
+        if bits[j]:
+            shift = 1 << (node.level - 2)
+            node = successor(node, j)
+            x, y = x + shift, y + shift
+    return node, x, y
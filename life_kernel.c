@@ -0,0 +1,71 @@
+/*
+ * life_kernel.c
+ * agent <agent@local>
+ * 2026-10-15
+ *
+ * C update kernel for Conway's Game of Life, wrapped by _life.pyx.
+ */
+
+#include "life_kernel.h"
+
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
+/* Update the interior cells of row x. Every one of them has all eight neighbors. */
+static void update_row(const uint8_t *restrict in, uint8_t *restrict out, int cols, int x)
+{
+    const uint8_t *top = in + (long)(x - 1) * cols;
+    const uint8_t *mid = in + (long)x * cols;
+    const uint8_t *bot = in + (long)(x + 1) * cols;
+    uint8_t *dst = out + (long)x * cols;
+    int y = 1;
+    int end = cols - 1;
+
+#ifdef __AVX2__
+    /* 32 cells per iteration. Each cell is 0 or 1, so a count never exceeds
+     * 8 and fits a byte lane. */
+    const __m256i one = _mm256_set1_epi8(1);
+    const __m256i two = _mm256_set1_epi8(2);
+    const __m256i three = _mm256_set1_epi8(3);
+    for (; y + 32 <= end; y += 32) {
+#define LOAD(row, off) _mm256_loadu_si256((const __m256i *)(row + y + off))
+        __m256i c = LOAD(mid, 0);
+        __m256i n = _mm256_add_epi8(LOAD(top, -1), LOAD(top, 0));
+        n = _mm256_add_epi8(n, LOAD(top, 1));
+        n = _mm256_add_epi8(n, LOAD(mid, -1));
+        n = _mm256_add_epi8(n, LOAD(mid, 1));
+        n = _mm256_add_epi8(n, LOAD(bot, -1));
+        n = _mm256_add_epi8(n, LOAD(bot, 0));
+        n = _mm256_add_epi8(n, LOAD(bot, 1));
+#undef LOAD
+        __m256i is3 = _mm256_cmpeq_epi8(n, three);
+        __m256i is2 = _mm256_cmpeq_epi8(n, two);
+        __m256i next = _mm256_or_si256(is3, _mm256_and_si256(is2, c));
+        _mm256_storeu_si256((__m256i *)(dst + y), _mm256_and_si256(next, one));
+    }
+#endif
+
+#pragma GCC ivdep
+    for (; y < end; y++) {
+        uint8_t n = top[y - 1] + top[y] + top[y + 1]
+                  + mid[y - 1] + mid[y + 1]
+                  + bot[y - 1] + bot[y] + bot[y + 1];
+        dst[y] = (n == 3) | (mid[y] & (n == 2));
+    }
+}
+
+long life_step(const uint8_t *in, uint8_t *out, int rows, int cols)
+{
+    long alive = 0;
+
+    /* The ghost border stays dead, so only the interior is written. */
+    for (int x = 1; x < rows - 1; x++) {
+        const uint8_t *dst = out + (long)x * cols;
+
+        update_row(in, out, cols, x);
+        for (int y = 1; y < cols - 1; y++)
+            alive += dst[y];
+    }
+    return alive;
+}
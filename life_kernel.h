@@ -0,0 +1,22 @@
+/*
+ * life_kernel.h
+ * agent <agent@local>
+ * 2026-10-15
+ *
+ * C update kernel for Conway's Game of Life, wrapped by _life.pyx.
+ */
+
+#ifndef LIFE_KERNEL_H
+#define LIFE_KERNEL_H
+
+#include <stdint.h>
+
+/*
+ * Advance a row-major (rows, cols) board of 0/1 bytes by one generation.
+ * The first and last row and column are a dead ghost border: they are read
+ * as neighbors but never written. `in` and `out` must not overlap. Returns
+ * the number of alive cells written to `out`.
+ */
+long life_step(const uint8_t *in, uint8_t *out, int rows, int cols);
+
+#endif
@@ -0,0 +1,222 @@
+"""
+life_kernels.py
+agent <agent@local>
+2026-10-15
+
+Update Kernels for Conway's Game of Life.
+
+This module contains the stand-alone step functions used by the `Grid` class.
+Each kernel takes the current generation and returns (or writes) the next one,
+so the `Grid` class only has to pick which kernel to run.
+
+
+"""
+
+import functools
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    from _life import step as step_c
+except ImportError:
+    step_c = None
+
+
+WORD_BITS = 64
+TILE = 32
+# Boards with at least this many cells get a Numba kernel compiled for their size.
+SPECIALIZE_CELLS = 1_000_000
+
+
+def pack_rows(cells):
+    """
+    Pack a uint8 cell array into 64-cell words along its second axis.
+
+    Params:
+        cells (numpy.ndarray): A (width, height) array of 0s and 1s.
+
+    Returns:
+        numpy.ndarray: A (width, ceil(height / 64)) uint64 array where cell y of a
+        row is bit y % 64 of word y // 64. Bits past the height are always 0.
+    """
+    width, height = cells.shape
+    words = -(-height // WORD_BITS)
+    padded = np.zeros((width, words * WORD_BITS), dtype=np.uint8)
+    padded[:, :height] = cells
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64)
+
+
+def unpack_rows(packed, height):
+    """
+    Unpack 64-cell words back into a uint8 cell array.
+
+    Params:
+        packed (numpy.ndarray): A (width, words) uint64 array from `pack_rows`.
+        height (int): Number of cells in each column.
+
+    Returns:
+        numpy.ndarray: A (width, height) uint8 array of 0s and 1s.
+    """
+    as_bytes = np.ascontiguousarray(packed, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=height, bitorder="little")
+
+
+def _full_add(a, b, c):
+    """
+    Add three bitplanes, returning the sum and carry bitplanes.
+    """
+    partial = a ^ b
+    return partial ^ c, (a & b) | (c & partial)
+
+
+def step_packed(p, out, height):
+    """
+    Advance a bit-packed board by one generation using SWAR logic.
+
+    Every word holds 64 cells, so each bitwise operation below updates 64
+    cells at once. The eight neighbors are summed with adder logic instead
+    of integer arithmetic; only whether the count is 2 or 3 matters.
+
+    Params:
+        p (numpy.ndarray): The current board as uint64 words from `pack_rows`,
+            with a dead ghost row above and below and a dead ghost word either
+            side of every row.
+        out (numpy.ndarray): A preallocated board of the same shape and ghost
+            border to write the next generation into. Must not be `p`.
+        height (int): Number of cells in each column.
+    """
+    one = np.uint64(1)
+    top_bit = np.uint64(WORD_BITS - 1)
+
+    mid = p[:, 1:-1]
+    # The y - 1 neighbor lands on bit y by shifting up and pulling the top
+    # bit of the previous word in; the y + 1 neighbor is the mirror image.
+    # The ghost words make the neighbors past the edge read as 0.
+    west = (mid << one) | (p[:, :-2] >> top_bit)
+    east = (mid >> one) | (p[:, 2:] << top_bit)
+
+    sum_top, carry_top = _full_add(west[:-2], mid[:-2], east[:-2])
+    sum_bot, carry_bot = _full_add(west[2:], mid[2:], east[2:])
+    sum_mid, carry_mid = west[1:-1] ^ east[1:-1], west[1:-1] & east[1:-1]
+
+    # ones is bit 0 of the count. The four carries each weigh 2, and the
+    # count is 2 or 3 exactly when one of them is set.
+    ones, carry_ones = _full_add(sum_top, sum_bot, sum_mid)
+    twos, fours = _full_add(carry_top, carry_bot, carry_mid)
+    exactly_one_two = (twos ^ carry_ones) & ~fours
+
+    alive = mid[1:-1]
+    new = out[1:-1, 1:-1]
+    np.bitwise_and(exactly_one_two, ones | alive, out=new)
+
+    tail = height % WORD_BITS
+    if tail:
+        new[:, -1] &= np.uint64((1 << tail) - 1)
+
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def step_numba(g, out):
+        """
+        Advance a uint8 board by one generation as compiled, multi-core code.
+
+        The board is walked in `TILE` x `TILE` blocks so the three rows each
+        cell reads stay in cache while the block is worked through. Blocks
+        are split across threads with `prange`. The ghost border means every
+        cell has all eight neighbors, so the inner loop has no bounds checks.
+        The compiled kernel is cached on disk, so only the first run pays for
+        compiling it.
+
+        Params:
+            g (numpy.ndarray): The current (width + 2, height + 2) uint8 board,
+                with a dead ghost border one cell wide on every side.
+            out (numpy.ndarray): A preallocated board of the same shape and ghost
+                border to write the next generation into. Must not be `g`.
+
+        Returns:
+            int: The number of alive cells in `out`.
+        """
+        # Bounds checks are off, so a smaller out would be written out of bounds.
+        if out.shape[0] != g.shape[0] or out.shape[1] != g.shape[1]:
+            raise ValueError("g and out must have the same shape")
+        width = g.shape[0] - 2
+        height = g.shape[1] - 2
+        tiles_x = (width + TILE - 1) // TILE
+        tiles_y = (height + TILE - 1) // TILE
+        alive = 0
+        for t in prange(tiles_x * tiles_y):
+            xb = (t // tiles_y) * TILE + 1
+            yb = (t % tiles_y) * TILE + 1
+            for x in range(xb, min(xb + TILE, width + 1)):
+                for y in range(yb, min(yb + TILE, height + 1)):
+                    n = (
+                        g[x - 1, y - 1] + g[x - 1, y] + g[x - 1, y + 1]
+                        + g[x, y - 1] + g[x, y + 1]
+                        + g[x + 1, y - 1] + g[x + 1, y] + g[x + 1, y + 1]
+                    )
+                    # Branch-free form of n == 3 or (alive and n == 2).
+                    cell = np.uint8((n | g[x, y]) == 3)
+                    out[x, y] = cell
+                    alive += cell
+        return alive
+
+    @functools.lru_cache(maxsize=None)
+    def make_step_numba(width, height):
+        """
+        Compile a Numba update kernel specialized to one board size.
+
+        The board size and tile counts are baked into the kernel as constants,
+        and its signature is fixed to C-contiguous uint8 boards, so Numba can
+        fold the strides, unroll around fixed trip counts and vectorize the
+        neighbor sum. Unlike `step_numba` it can't be cached on disk, so it is
+        compiled afresh (about a second) in every process; that only pays off
+        on boards of `SPECIALIZE_CELLS` cells or more.
+
+        Params:
+            width (int): Number of cells in each row.
+            height (int): Number of cells in each column.
+
+        Returns:
+            function: `step(g, out)`, the same as `step_numba`.
+        """
+        tiles_x = (width + TILE - 1) // TILE
+        tiles_y = (height + TILE - 1) // TILE
+
+        @njit("int64(uint8[:, ::1], uint8[:, ::1])", parallel=True, boundscheck=False)
+        def step_sized(g, out):
+            # The sizes are baked in and bounds checks are off, so a board of
+            # any other shape would be read and written out of bounds.
+            if (
+                g.shape[0] != width + 2 or g.shape[1] != height + 2
+                or out.shape[0] != width + 2 or out.shape[1] != height + 2
+            ):
+                raise ValueError("g and out must both be (width + 2, height + 2)")
+            alive = 0
+            for t in prange(tiles_x * tiles_y):
+                xb = (t // tiles_y) * TILE + 1
+                yb = (t % tiles_y) * TILE + 1
+                for x in range(xb, min(xb + TILE, width + 1)):
+                    for y in range(yb, min(yb + TILE, height + 1)):
+                        n = (
+                            g[x - 1, y - 1] + g[x - 1, y] + g[x - 1, y + 1]
+                            + g[x, y - 1] + g[x, y + 1]
+                            + g[x + 1, y - 1] + g[x + 1, y] + g[x + 1, y + 1]
+                        )
+                        # Branch-free form of n == 3 or (alive and n == 2).
+                        cell = np.uint8((n | g[x, y]) == 3)
+                        out[x, y] = cell
+                        alive += cell
+            return alive
+
+        return step_sized
+
+else:
+    step_numba = None
+    make_step_numba = None
@@ -6,29 +6,113 @@ Brodie Rogers <brodie.rogers@students.cune.edu>
 Conway's Game of Life Simulation with Random Revival Feature.
 
 This program simulates Conway's Game of Life using Pygame. 
-Users can toggle cells alive or dead with the mouse, pause/resume the simulation, 
+Users can draw live cells with the mouse, pause/resume the simulation, 
 and observe the live cell count. Cells may randomly come to life with a small chance.
 
 """
 
+import argparse
+import functools
 import pygame
-from john_conways import Grid
+from john_conways import MODES, Grid
 
 
-def handle_mouse_input(grid, cell_size):
+# Input is polled and the screen redrawn this many times per second, however
+# fast the simulation itself is running.
+RENDER_FPS = 60
+
+KEY_BINDINGS = "Pause/Play: SPACE | Randomly Spawn Cells: s | Faster: = | Slower: - | Left Click/Drag: Draw Cells"
+
+
+def make_grid(grid_width, grid_height, cell_size, mode):
+    """
+    Create the game grid, falling back to the NumPy kernel if `mode` is unavailable.
+
+    Params:
+        grid_width (int): Width of the grid in cells.
+        grid_height (int): Height of the grid in cells.
+        cell_size (int): Size of each cell in pixels.
+        mode (str): The update kernel to ask for, one of `MODES`.
+
+    Returns:
+        Grid: The game grid object.
+    """
+    try:
+        return Grid(grid_width, grid_height, cell_size, mode)
+    except ImportError as error:
+        print(f"{error}; falling back to mode=\"numpy\"")
+        return Grid(grid_width, grid_height, cell_size, "numpy")
+
+
+def line_cells(start, end):
+    """
+    List the cells on a straight line between two cells, using Bresenham's algorithm.
+
+    Params:
+        start (tuple): The (x, y) cell the line starts from, which is not included.
+        end (tuple): The (x, y) cell the line ends at, which is included.
+
+    Returns:
+        list of tuple: The cells from just after `start` up to `end`.
+    """
+    x, y = start
+    x1, y1 = end
+    dx, dy = abs(x1 - x), -abs(y1 - y)
+    step_x = 1 if x < x1 else -1
+    step_y = 1 if y < y1 else -1
+    error = dx + dy
+    cells = []
+    while (x, y) != (x1, y1):
+        if 2 * error >= dy:
+            error += dy
+            x += step_x
+        if 2 * error <= dx:
+            error += dx
+            y += step_y
+        cells.append((x, y))
+    return cells
+
+
+def handle_mouse_input(event, grid, cell_size, last_painted):
     """
-    Toggle a cell's alive state based on mouse input.
+    Paint cells alive while the left mouse button is held down.
+
+    Dragging paints a line of cells from the last painted cell to the one
+    under the mouse, so a fast drag leaves no gaps. A cell is painted once
+    per pass, however many events arrive while the mouse is over it. Each
+    press starts a new stroke, and the stroke ends if the window loses focus
+    or the mouse leaves it, since the button can be let go unseen there.
 
     Params:
+        event (pygame.event.Event): The Pygame event to process.
         grid (Grid): The game grid object.
         cell_size (int): Size of each cell in pixels.
+        last_painted (tuple or None): The last cell painted during this drag.
+
+    Returns:
+        tuple or None: The updated last painted cell.
     """
-    mouse_pressed = pygame.mouse.get_pressed()
-    if mouse_pressed[0]:
-        x, y = pygame.mouse.get_pos()
-        grid_x, grid_y = x // cell_size, y // cell_size
-        if 0 <= grid_x < grid.width and 0 <= grid_y < grid.height:
-            grid.grid[grid_x][grid_y].is_alive = not grid.grid[grid_x][grid_y].is_alive
+    if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+        return None
+    if event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWLEAVE):
+        return None
+    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        last_painted = None
+    pressed = (
+        (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1)
+        or (event.type == pygame.MOUSEMOTION and event.buttons[0])
+    )
+    if not pressed:
+        return last_painted
+
+    x, y = event.pos
+    cell = (x // cell_size, y // cell_size)
+    if cell == last_painted or not (0 <= cell[0] < grid.width and 0 <= cell[1] < grid.height):
+        return last_painted
+    # Both ends are on the board, so every cell between them is too.
+    for line_cell in [cell] if last_painted is None else line_cells(last_painted, cell):
+        grid.paint(*line_cell)
+    return cell
 
 
 def process_input(event, game_world, flip_flop, paused, simulation_speed):
@@ -62,35 +146,61 @@ def process_input(event, game_world, flip_flop, paused, simulation_speed):
     return flip_flop, paused, simulation_speed
 
 
-def render_text(screen, font, paused, simulation_speed, game_world, grid_height, grid_width, cell_size):
+@functools.lru_cache(maxsize=1)
+def render_status(font, paused, alive_count, simulation_speed, spawning):
+    """
+    Render the game's status line, reusing the last surface if nothing changed.
+
+    Params:
+        font (pygame.font.Font): The font used for text rendering.
+        paused (bool): Indicates if the simulation is paused.
+        alive_count (int): The current count of alive cells in the grid.
+        simulation_speed (int): Speed of the simulation.
+        spawning (bool): Indicates if random spawning of cells is enabled.
+
+    Returns:
+        pygame.Surface: The rendered status line.
+    """
+    text = "Paused" if paused else "Running"
+    spawning = "True" if spawning else "False"
+    return font.render(f"Game State: {text} | Alive: {alive_count} | Simulation Speed: {simulation_speed} | Spawning: {spawning}", True, "white")
+
+
+def render_text(screen, font, key_bind_surface, paused, simulation_speed, game_world, grid_height, grid_width, cell_size):
     """
     Render the game's status and key binding information.
 
     Params:
         screen (pygame.Surface): The Pygame display surface.
         font (pygame.font.Font): The font used for text rendering.
+        key_bind_surface (pygame.Surface): The key bindings, rendered once up front.
         paused (bool): Indicates if the simulation is paused.
         simulation_speed (int): Speed of the simulation.
         game_world (Grid): The game grid object.
         grid_height (int): Height of the grid in cells.
         grid_width (int): Width of the grid in cells.
         cell_size (int): Size of each cell in pixels.
+
+    Returns:
+        list of pygame.Rect: The screen areas the text was drawn to.
     """
-    text = "Paused" if paused else "Running"
-    spawning = "True" if game_world.spawing else "False"
-    text_surface = font.render(f"Game State: {text} | Alive: {game_world.alive_count} | Simulation Speed: {simulation_speed} | Spawning: {spawning}", True, "white")
+    text_surface = render_status(font, paused, game_world.alive_count, simulation_speed, game_world.spawing)
     display_info_y = (grid_height * cell_size) - (cell_size * 70)
-    screen.blit(text_surface, (display_info_y, 10))
+    status_rect = screen.blit(text_surface, (display_info_y, 10))
 
-    key_bind_text = font.render("Pause/Play: SPACE | Randomly Spawn Cells: s | Faster: = | Slower: - | Left Click: Toggle Cell", True, "white")
     info_text_height = (grid_width * cell_size) - 20
-    screen.blit(key_bind_text, (display_info_y, info_text_height))
+    key_bind_rect = screen.blit(key_bind_surface, (display_info_y, info_text_height))
+    return [status_rect, key_bind_rect]
 
 
 def main():
     """
     Main function to run the Conway's Game of Life simulation.
     """
+    parser = argparse.ArgumentParser(description="Conway's Game of Life")
+    parser.add_argument("--mode", choices=MODES, default="numpy", help="update kernel to run (default: numpy)")
+    args = parser.parse_args()
+
     pygame.init()
     flip_flop = 1
     simulation_speed = 10
@@ -101,27 +211,52 @@ def main():
     screen = pygame.display.set_mode((grid_width * cell_size, grid_height * cell_size))
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, font_size)
+    key_bind_surface = font.render(KEY_BINDINGS, True, "white")
 
-    game_world = Grid(grid_width, grid_height, cell_size)
+    game_world = make_grid(grid_width, grid_height, cell_size, args.mode)
 
     running = True
     paused = True
+    text_rects = []
+    last_painted = None
+    update_accumulator = 0.0
+    redraw = True
+    screen.fill("black")
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN:
+                redraw = True
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                # The window system may have thrown away what was on screen.
+                game_world.invalidate()
+                redraw = True
             flip_flop, paused, simulation_speed = process_input(event, game_world, flip_flop, paused, simulation_speed)
+            alive_count = game_world.alive_count
+            last_painted = handle_mouse_input(event, game_world, cell_size, last_painted)
+            if game_world.alive_count != alive_count:
+                redraw = True
 
-        handle_mouse_input(game_world, cell_size)
-
+        # Run simulation_speed updates per second spread over the frames,
+        # carrying any fraction of an update over to the next frame.
         if not paused:
-            game_world.update()
+            update_accumulator += simulation_speed / RENDER_FPS
+            # Every whole update owed goes to advance at once, so hashlife mode
+            # can jump them together instead of stepping one at a time.
+            pending = int(update_accumulator)
+            if pending:
+                game_world.advance(pending)
+                update_accumulator -= pending
+                redraw = True
 
-        screen.fill("black")
-        game_world.draw(screen)
-        render_text(screen, font, paused, simulation_speed, game_world, grid_height, grid_width, cell_size)
-        pygame.display.flip()
-        clock.tick(simulation_speed)
+        if redraw:
+            # Repaint last frame's text areas from the grid before drawing the new text.
+            dirty_rects = game_world.draw(screen, text_rects)
+            text_rects = render_text(screen, font, key_bind_surface, paused, simulation_speed, game_world, grid_height, grid_width, cell_size)
+            pygame.display.update(dirty_rects + text_rects)
+            redraw = False
+        clock.tick(RENDER_FPS)
 
     pygame.quit()
 
@@ -0,0 +1,28 @@
+"""
+setup.py
+agent <agent@local>
+2026-10-15
+
+Builds the optional `_life` C extension used by `Grid(mode="c")`.
+Building it needs Cython and a C compiler; the game runs without them.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+
+"""
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+
+extension = Extension(
+    "_life",
+    sources=["_life.pyx", "life_kernel.c"],
+    extra_compile_args=["-O3", "-march=native"],
+)
+
+setup(
+    name="john_conways_game_of_life",
+    ext_modules=cythonize([extension]),
+)
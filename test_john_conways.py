@@ -0,0 +1,160 @@
+"""
+test_john_conways.py
+agent <agent@local>
+2026-10-15
+
+Tests for the `Grid` class.
+
+Every mode is checked against a plain reference step on boards of several
+sizes and densities, so a change to a kernel or to the bounding-box logic
+that gets a cell wrong shows up here. Run with `python -m pytest`.
+
+
+"""
+
+import numpy as np
+import pytest
+
+import john_conways
+from john_conways import MODES, Grid
+from life_kernels import step_c, step_numba
+
+
+SIZES = [(1, 1), (5, 64), (70, 3), (37, 130), (100, 100)]
+DENSITIES = [0.05, 0.35, 0.8]
+
+
+def reference_step(cells):
+    """
+    Advance a board by one generation the plain way, with dead cells past the edge.
+    """
+    width, height = cells.shape
+    padded = np.pad(cells.astype(np.int64), 1)
+    n = sum(
+        padded[1 + dx:1 + dx + width, 1 + dy:1 + dy + height]
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        if dx or dy
+    )
+    return ((n == 3) | ((cells == 1) & (n == 2))).astype(np.uint8)
+
+
+def load(grid, cells):
+    """
+    Set a grid's cells to match a board.
+    """
+    for x, y in np.argwhere(cells):
+        grid.toggle(x, y)
+    grid.alive_count = int(grid.grid.sum())
+
+
+def random_cells(rng, width, height, density):
+    return (rng.random((width, height)) < density).astype(np.uint8)
+
+
+@pytest.fixture(params=MODES)
+def mode(request):
+    if request.param == "numba" and step_numba is None:
+        pytest.skip("numba is not installed")
+    if request.param == "c" and step_c is None:
+        pytest.skip("the _life extension has not been built")
+    return request.param
+
+
+def check(grid, cells):
+    assert np.array_equal(grid.grid, cells)
+    assert grid.alive_count == int(cells.sum())
+
+
+@pytest.mark.parametrize("density", DENSITIES)
+@pytest.mark.parametrize("width, height", SIZES)
+def test_update_matches_reference(mode, width, height, density):
+    rng = np.random.default_rng(width * height)
+    cells = random_cells(rng, width, height, density)
+    grid = Grid(width, height, 1, mode)
+    load(grid, cells)
+    for _ in range(12):
+        grid.update()
+        cells = reference_step(cells)
+        check(grid, cells)
+
+
+def test_numba_size_specialized_kernel(monkeypatch):
+    if step_numba is None:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(john_conways, "SPECIALIZE_CELLS", 0)
+    rng = np.random.default_rng(1)
+    cells = random_cells(rng, 37, 130, 0.35)
+    grid = Grid(37, 130, 1, "numba")
+    load(grid, cells)
+    for _ in range(5):
+        grid.update()
+        cells = reference_step(cells)
+        check(grid, cells)
+    assert grid._kernel is not step_numba
+
+
+def test_edits_between_updates(mode):
+    rng = np.random.default_rng(2)
+    cells = random_cells(rng, 40, 70, 0.2)
+    grid = Grid(40, 70, 1, mode)
+    load(grid, cells)
+    for _ in range(30):
+        for x, y in zip(rng.integers(0, 40, 5), rng.integers(0, 70, 5)):
+            grid.toggle(x, y)
+            cells[x, y] ^= 1
+        for x, y in zip(rng.integers(0, 40, 5), rng.integers(0, 70, 5)):
+            grid.paint(x, y)
+            cells[x, y] = 1
+        grid.alive_count = int(grid.grid.sum())
+        assert all(grid.is_alive(x, y) == bool(cells[x, y]) for x, y in np.ndindex(cells.shape))
+        grid.update()
+        cells = reference_step(cells)
+        check(grid, cells)
+
+
+def test_sparse_pattern_crossing_the_board(mode):
+    # A glider flies into the far corner and turns into a block, taking the
+    # NumPy path through its bounding-box steps, rescans and full steps.
+    cells = np.zeros((60, 60), dtype=np.uint8)
+    for x, y in ((1, 0), (2, 1), (0, 2), (1, 2), (2, 2)):
+        cells[x, y] = 1
+    grid = Grid(60, 60, 1, mode)
+    load(grid, cells)
+    for _ in range(250):
+        grid.update()
+        cells = reference_step(cells)
+        check(grid, cells)
+
+
+def test_spawning(mode):
+    np.random.seed(3)
+    rng = np.random.default_rng(3)
+    grid = Grid(50, 90, 1, mode)
+    load(grid, random_cells(rng, 50, 90, 0.1))
+    grid.spawing = True
+    for _ in range(10):
+        grid.update()
+        assert grid.alive_count == int(grid.grid.sum())
+    # Spawning must leave the dead border alone, or the next plain step is wrong.
+    grid.spawing = False
+    cells = grid.grid.copy()
+    for _ in range(5):
+        grid.update()
+        cells = reference_step(cells)
+        check(grid, cells)
+
+
+@pytest.mark.parametrize("generations", [1, 7, 40, 150])
+def test_advance_matches_reference(mode, generations):
+    # Patterns in the middle of a big board let hashlife mode take long jumps.
+    rng = np.random.default_rng(generations)
+    cells = np.zeros((120, 120), dtype=np.uint8)
+    cells[50:70, 50:70] = random_cells(rng, 20, 20, 0.4)
+    grid = Grid(120, 120, 1, mode)
+    load(grid, cells)
+    for _ in range(2):
+        grid.advance(generations)
+        for _ in range(generations):
+            cells = reference_step(cells)
+        check(grid, cells)